@@ -1,26 +1,74 @@
 import os
+import copy
+import time
+import atexit
+import asyncio
+import threading
+from collections import deque
+from functools import lru_cache
+import numpy as np
 import pandas as pd
-import pytz
 from datetime import datetime, timedelta
-from supabase import create_client
+from zoneinfo import ZoneInfo
+import httpx
+from supabase import create_client, acreate_client, ClientOptions
+from realtime import RealtimeSubscribeStates
 
 import dash
-from dash import dcc, html, dash_table
+from dash import dcc, html, dash_table, Patch
 from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import request
+from tsdownsample import LTTBDownsampler
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+# Dash serializes callback output through plotly.io, so this makes every figure/Patch response use orjson.
+pio.json.config.default_engine = "orjson"
+# The data path is IO-bound; copy-on-write lets slicing/reset_index share buffers instead of copying them.
+# pandas 3 always copies on write (the option is deprecated there); pandas 2 has to opt in.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
 
 # --- Supabase Connection ---
 SUPABASE_URL = "https://ynodggqmitbqluwmljjg.supabase.co"
 SUPABASE_KEY = "<YOUR_SUPABASE_KEY>"  # Replace with your valid key
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# PostgREST requests go through Supabase's pooled connections; fail fast instead of holding a slot for the 120 s default.
+POSTGREST_TIMEOUT_SECONDS = 5
+# Supabase's API "Max rows" setting (default 1000); PostgREST silently truncates any table or RPC result beyond it.
+POSTGREST_MAX_ROWS = 1000
+
+@lru_cache(maxsize=1)
+def get_supabase():
+    # One client per process, backed by a keep-alive HTTP/2 pool so repeated queries skip the TCP+TLS handshake.
+    # max_connections caps concurrent sockets so bursts of callbacks queue instead of exhausting Supabase's connection limit.
+    http_client = httpx.Client(http2=True, timeout=POSTGREST_TIMEOUT_SECONDS,
+                               limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+    atexit.register(http_client.close)
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(
+        postgrest_client_timeout=POSTGREST_TIMEOUT_SECONDS, httpx_client=http_client))
 
 # --- Constants & Configuration ---
+# Timestamps are held as naive IST wall time: tz-aware indexes are markedly slower to build, compare and format,
+# and IST has no DST so the naive value is unambiguous. Only Supabase query bounds re-attach the zone.
+IST = ZoneInfo("Asia/Kolkata")
+
+def now_ist():
+    return datetime.now(IST).replace(tzinfo=None)
 STATUS_THRESHOLDS = {
     "temperature": {"name": "Motor Temperature", "unit": "°C", "warn": 60, "crit": 80, "range": [0, 100]},
     "pressure": {"name": "Output Pressure", "unit": "bar", "warn": 9, "crit": 12, "range": [0, 15]},
     "vibration": {"name": "Vibration Level", "unit": "mm/s", "warn": 3, "crit": 5, "range": [0, 8]},
 }
+COLUMNS = ["timestamp", *STATUS_THRESHOLDS]
+LIVE_WINDOW = timedelta(hours=1)
+# (max data age in seconds, refresh interval in ms): poll fast while the compressor is reporting, back off when idle.
+REFRESH_INTERVALS = [(5 * 60, 5 * 1000), (30 * 60, 30 * 1000), (float("inf"), 60 * 1000)]
+MAX_TREND_POINTS = 200  # per trace, after LTTB downsampling
+TREND_REFRESH = timedelta(seconds=30)  # gauges follow every tick; an hour-wide trend doesn't need 5 s redraws
 STATUS_COLORS = {"normal": "#00AEEF", "warning": "#F5A623", "critical": "#D0021B"}
+STATUS_FILL_RGBA = {k: f"rgba({int(v[1:3],16)}, {int(v[3:5],16)}, {int(v[5:7],16)}, 0.1)" for k, v in STATUS_COLORS.items()}
 DARK_THEME = {
     'background': '#f0f0f0',
     'component_bg': '#ffffff',
@@ -30,25 +78,239 @@ DARK_THEME = {
 }
 
 # --- Data Fetching ---
-def fetch_data(start_date=None, end_date=None, desc=True, limit=200):
+CACHE_TTL_SECONDS = 5
+EXPLORER_CACHE_TTL_SECONDS = 60  # explorer ranges are mostly historical; re-clicking Query shouldn't refetch
+TABLE = "air_compressor"
+LIVE_ROLLUP_TABLE = "air_compressor_10s"  # 10 s averages of the recent window, see sql/air_compressor.sql
+
+EXPLORER_MAX_POINTS = POSTGREST_MAX_ROWS  # more buckets would be cut off at max-rows, dropping the end of the range
+SENSOR_DTYPE = "float32"
+EXPLORER_DECIMALS = 3  # float32 holds ~7 significant digits; don't ship widened float64 noise to the table
+
+def _end_exclusive(end_date):
+    return str(datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1))
+
+def _downcast_sensors(df):
+    # ESP32 readings carry far less than float32 precision; halves frame memory and shortens the JSON sent to Plotly.
+    return df.astype({c: SENSOR_DTYPE for c in df.columns if c in STATUS_THRESHOLDS})
+
+def _records_to_frame(records):
+    # Rows keep the server's ORDER BY; callers flip a descending window with iloc[::-1] rather than re-sorting.
+    if not records:
+        return pd.DataFrame()
+    # Build column arrays directly (sensors straight into float32) instead of letting pandas walk row dicts.
+    cols = {c: np.array([r[c] for r in records], dtype=SENSOR_DTYPE if c in STATUS_THRESHOLDS else object)
+            for c in records[0]}
+    index = pd.DatetimeIndex(pd.to_datetime(cols.pop("timestamp"), format="ISO8601", utc=True), name="timestamp")
+    return pd.DataFrame(cols, index=index.tz_convert(IST).tz_localize(None))
+
+@lru_cache(maxsize=16)
+def _fetch_raw(table, columns, start_date, end_date, desc, limit, ttl, bucket):
+    # `bucket` is time // ttl; it only exists to expire cache entries every `ttl` seconds.
+    query = get_supabase().table(table).select(",".join(columns))
+    if start_date:
+        query = query.gte("timestamp", start_date)
+    if end_date:
+        query = query.lt("timestamp", _end_exclusive(end_date))
+    query = query.order("timestamp", desc=desc).limit(limit)
+    return _records_to_frame(query.execute().data)
+
+@lru_cache(maxsize=16)
+def _fetch_downsampled_raw(columns, start_date, end_date, n_buckets, ttl, bucket):
+    resp = get_supabase().rpc("downsample_air_compressor", {
+        "_start": start_date, "_end": _end_exclusive(end_date), "_n": n_buckets}).select(",".join(columns)).execute()
+    return _records_to_frame(resp.data)
+
+_fetch_lock = threading.Lock()  # guards the two dicts below; never held across a request
+_key_locks = {}  # (fetcher, query) -> lock held while that query is in flight
+_last_good = {}  # (fetcher, query) -> last successful frame, served when Supabase errors
+LAST_GOOD_MAX_ENTRIES = 16
+
+def _key_lock(key):
+    with _fetch_lock:
+        if key not in _key_locks and len(_key_locks) >= LAST_GOOD_MAX_ENTRIES:
+            # Forget idle locks so the dict doesn't grow with every explorer range ever queried.
+            for k in [k for k, lock in _key_locks.items() if not lock.locked()]:
+                del _key_locks[k]
+        return _key_locks.setdefault(key, threading.Lock())
+
+def _cached_fetch(fetcher, query, ttl, fallback=True):
+    # Per-query lock: overlapping callbacks for the same query wait for the first request and then hit the
+    # lru_cache, while unrelated queries run in parallel.
+    # Errors raise out of the lru_cache'd fetcher, so a failure is never cached for the rest of the bucket.
+    # fallback=False re-raises instead of serving the last good frame, for callers that must tell failure from no rows.
+    key = (fetcher, query)
+    with _key_lock(key):
+        try:
+            df = fetcher(*query, ttl, int(time.time() // ttl))
+        except Exception as e:
+            if not fallback: raise
+            print(f"Error fetching data: {e}")
+            with _fetch_lock:
+                df = _last_good.get(key, pd.DataFrame())
+        else:
+            with _fetch_lock:
+                _last_good.pop(key, None)
+                _last_good[key] = df
+                if len(_last_good) > LAST_GOOD_MAX_ENTRIES:
+                    del _last_good[next(iter(_last_good))]
+    # Shallow copy: with copy-on-write, a caller writing to its frame never touches the shared cached one.
+    return df.copy(deep=False)
+
+def fetch_downsampled(start_date, end_date, n_buckets=EXPLORER_MAX_POINTS, ttl=EXPLORER_CACHE_TTL_SECONDS, columns=tuple(COLUMNS)):
+    # Bucket averages computed in Postgres, so any date range costs at most n_buckets rows.
+    return _cached_fetch(_fetch_downsampled_raw, (tuple(columns), start_date, end_date, n_buckets), ttl)
+
+def fetch_data(start_date=None, end_date=None, desc=True, limit=200, table=TABLE, ttl=CACHE_TTL_SECONDS, columns=tuple(COLUMNS),
+               fallback=True):
+    return _cached_fetch(_fetch_raw, (table, tuple(columns), start_date, end_date, desc, limit), ttl, fallback)
+
+# --- Realtime Live Buffer ---
+# Requires the realtime publication and timestamp index from sql/air_compressor.sql.
+# New rows are pushed over the websocket into a rolling buffer, so the live view never re-downloads history.
+# The buffer holds 10 s buckets like air_compressor_10s: the seed comes from that view and raw realtime rows are
+# folded into running means, so the window always spans the full hour whatever the sensors' ingest rate.
+LIVE_BUCKET = timedelta(seconds=10)
+LIVE_BUFFER = deque(maxlen=int(LIVE_WINDOW / LIVE_BUCKET) + 1)
+_live_lock = threading.Lock()
+_live_thread = None
+_last_raw_ts = None  # newest raw reading folded into the buffer; older or repeated rows are skipped
+_latest_raw = None  # that reading itself: gauges, statuses and the header show it, never a partial-bucket mean
+_backfill_running = False
+# Realtime rows parked while a backfill is in flight, or while the hour is still unseeded after a failed seed
+# (bounded: the seed re-fetches them anyway). None when rows fold straight into the buffer.
+_backfill_pending = None
+REALTIME_HEALTH_CHECK_SECONDS = 5
+
+def _to_live_row(record):
+    row = {c: record.get(c) for c in COLUMNS}
+    row["timestamp"] = pd.to_datetime(row["timestamp"], format="ISO8601", utc=True).tz_convert(IST).tz_localize(None)
+    return row
+
+def _fold_row(row):
+    # Caller holds _live_lock. Readings arrive in timestamp order, so only the newest bucket is ever open.
+    global _last_raw_ts, _latest_raw
+    ts = row["timestamp"]
+    if _last_raw_ts is not None and ts <= _last_raw_ts: return
+    _last_raw_ts, _latest_raw = ts, row
+    bucket = ts.floor(LIVE_BUCKET)
+    if not LIVE_BUFFER or LIVE_BUFFER[-1]["timestamp"] != bucket:
+        LIVE_BUFFER.append({"timestamp": bucket, **dict.fromkeys(STATUS_THRESHOLDS, np.nan),
+                            "counts": dict.fromkeys(STATUS_THRESHOLDS, 0)})
+    slot = LIVE_BUFFER[-1]
+    for p in STATUS_THRESHOLDS:
+        v = row[p]
+        if v is None or v != v: continue
+        n = slot["counts"][p] = slot["counts"][p] + 1
+        slot[p] = v if n == 1 else slot[p] + (v - slot[p]) / n
+
+def _on_insert(payload):
+    row = _to_live_row(payload["data"]["record"])
+    with _live_lock:
+        if _backfill_pending is not None:
+            _backfill_pending.append(row)
+        else:
+            _fold_row(row)
+
+def _raw_rows_since(ts):
+    # Newest POSTGREST_MAX_ROWS raw readings from `ts` on, oldest first.
+    delta = fetch_data(start_date=ts.tz_localize(IST).isoformat(), limit=POSTGREST_MAX_ROWS, fallback=False)
+    return delta.iloc[::-1].reset_index().to_dict("records")
+
+def _backfill():
+    # Seed an empty buffer from the rollup, otherwise fold in only the readings newer than the last one seen.
+    global _backfill_pending, _backfill_running, _last_raw_ts
+    with _live_lock:
+        if _backfill_running: return
+        _backfill_running = True
+        if _backfill_pending is None:
+            _backfill_pending = deque(maxlen=POSTGREST_MAX_ROWS)
+        last_ts = _last_raw_ts
+    seeding = last_ts is None
+    seed, rows = [], None
+    # The fetches run without the lock: _on_insert takes it on the realtime event loop, which must never wait on HTTP.
     try:
-        query = supabase.table("air_compressor").select("*")
-        if start_date:
-            query = query.gte("timestamp", start_date)
-        if end_date:
-            end_date_inclusive = datetime.strptime(end_date, '%Y-%m-%d').date() + timedelta(days=1)
-            query = query.lt("timestamp", str(end_date_inclusive))
-        query = query.order("timestamp", desc=desc).limit(limit)
-        resp = query.execute()
-        if not resp.data:
-            return pd.DataFrame()
-        df = pd.DataFrame(resp.data)
-        ist = pytz.timezone("Asia/Kolkata")
-        df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.tz_convert(ist)
-        return df.set_index("timestamp").sort_index(ascending=not desc)
+        if seeding:
+            since = pd.Timestamp(now_ist()) - LIVE_WINDOW
+            rollup = fetch_data(start_date=since.tz_localize(IST).isoformat(), limit=LIVE_BUFFER.maxlen,
+                                table=LIVE_ROLLUP_TABLE, fallback=False)
+            # The view's newest bucket may have been refreshed mid-bucket; rebuild it from raw readings instead.
+            rollup = rollup.iloc[1:]
+            seed = rollup.iloc[::-1].reset_index().to_dict("records")
+            # Timestamps have microsecond resolution, so this admits every reading from the first unseeded bucket on.
+            last_ts = (rollup.index[0] + LIVE_BUCKET if not rollup.empty else since) - pd.Timedelta(1, "us")
+        rows = _raw_rows_since(last_ts)
     except Exception as e:
-        print(f"Error fetching data: {e}")
-        return pd.DataFrame()
+        print(f"Live backfill failed: {e}")
+    finally:
+        with _live_lock:
+            _backfill_running = False
+            # A failed seed leaves the buffer unseeded and keeps parking rows, so the retry still loads the full hour.
+            if rows is not None or not seeding:
+                if seeding:
+                    LIVE_BUFFER.extend(seed)
+                    _last_raw_ts = last_ts
+                pending, _backfill_pending = _backfill_pending, None
+                # Rows inserted after the fetch started can come back from both sources; _fold_row keeps one copy.
+                for row in [*(rows or []), *pending]:
+                    _fold_row(row)
+
+def _on_subscribe(state, error):
+    # Fires on every (re)join. realtime-py's auto-reconnect doesn't replay inserts missed while the socket was down,
+    # so each join backfills the gap; the fetch goes to a worker thread to keep this event loop responsive.
+    if state == RealtimeSubscribeStates.SUBSCRIBED:
+        asyncio.get_running_loop().run_in_executor(None, _backfill)
+    elif error:
+        print(f"Realtime subscription {state.value.lower()}: {error}")
+
+async def _listen():
+    client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    await client.channel("compressor").on_postgres_changes(
+        "INSERT", schema="public", table=TABLE, callback=_on_insert).subscribe(_on_subscribe)
+    # realtime-py reads the socket (and auto-reconnects) inside its listen task. That task ends on a clean close or
+    # once reconnect retries run out; then nothing reads the socket again, so end this thread and let
+    # _ensure_live_subscription start a fresh listener.
+    socket = client.realtime
+    while socket._listen_task is not None and not socket._listen_task.done():
+        await asyncio.sleep(REALTIME_HEALTH_CHECK_SECONDS)
+    task = socket._listen_task
+    error = task.exception() if task is not None and not task.cancelled() else None
+    await socket.close()
+    raise ConnectionError(f"realtime socket closed{f': {error}' if error else ''}")
+
+def _run_listener():
+    try:
+        asyncio.run(_listen())
+    except Exception as e:
+        print(f"Realtime subscription stopped: {e}")
+
+def _ensure_live_subscription():
+    global _live_thread
+    with _live_lock:
+        if _live_thread is not None and _live_thread.is_alive():
+            if _backfill_pending is not None and not _backfill_running:
+                # A seed failed; retry it now rather than waiting for the channel's next rejoin.
+                threading.Thread(target=_backfill, name="live-backfill", daemon=True).start()
+            return
+        # The buffer is filled by _backfill once the channel joins, not here.
+        _live_thread = threading.Thread(target=_run_listener, name="supabase-realtime", daemon=True)
+        _live_thread.start()
+
+def get_live_data():
+    # Returns the bucketed window (for the trends) and the newest raw reading (for gauges, statuses and header).
+    _ensure_live_subscription()
+    cutoff = now_ist() - LIVE_WINDOW
+    with _live_lock:
+        while LIVE_BUFFER and LIVE_BUFFER[0]["timestamp"] < cutoff:
+            LIVE_BUFFER.popleft()
+        rows = list(LIVE_BUFFER)
+        if rows:
+            rows[-1] = dict(rows[-1])  # the open bucket keeps changing under _on_insert
+        reading = _latest_raw if _latest_raw is not None and _latest_raw["timestamp"] >= cutoff else None
+    if not rows:
+        return pd.DataFrame(), None
+    # Seeded from the rollup with no raw reading yet: the newest bucket is the best available.
+    return _downcast_sensors(pd.DataFrame(rows, columns=COLUMNS)).set_index("timestamp"), reading or rows[-1]
 
 # --- Helper Functions ---
 def get_status(val, param):
@@ -58,14 +320,18 @@ def get_status(val, param):
     if val >= t["warn"]: return "warning"
     return "normal"
 
-def create_meter_gauge(value, param):
+def downsample(series, n_out=MAX_TREND_POINTS):
+    series = series.dropna()
+    if len(series) <= n_out: return series
+    return series.iloc[LTTBDownsampler().downsample(series.index.asi8, series.to_numpy(dtype=float), n_out=n_out)]
+
+def _gauge_indicator(value, param, status):
     t = STATUS_THRESHOLDS[param]
-    status = get_status(value, param)
     color = STATUS_COLORS[status]
-    fig = go.Figure(go.Indicator(
+    return go.Indicator(
         mode="gauge+number",
         value=value if pd.notna(value) else 0,
-        number={'font': {'size': 40, 'color': color}, 'suffix': t['unit']},
+        number={'font': {'size': 40, 'color': color}, 'suffix': t['unit'], 'valueformat': '.1f'},
         gauge={
             'axis': {'range': t['range'], 'tickwidth': 1, 'tickcolor': DARK_THEME['text']},
             'bar': {'color': color, 'thickness': 0.5},
@@ -78,33 +344,130 @@ def create_meter_gauge(value, param):
             ]
         },
         title={'text': t['name'], 'font': {'size': 20, 'color': DARK_THEME['text']}}
-    ))
-    fig.update_layout(height=300, width=180, margin=dict(l=10, r=10, t=50, b=10),
-                      paper_bgcolor=DARK_THEME['component_bg'], font_color=DARK_THEME['text'])
+    )
+
+def create_meter_gauges(latest, statuses):
+    # All gauges share one figure: one dcc.Graph, one JSON payload, one Plotly.js mount.
+    params = list(STATUS_THRESHOLDS)
+    fig = make_subplots(rows=len(params), cols=1, vertical_spacing=0.08, specs=[[{'type': 'indicator'}]] * len(params))
+    for row, p in enumerate(params, start=1):
+        fig.add_trace(_gauge_indicator(latest[p], p, statuses[p]), row=row, col=1)
+    fig.update_layout(height=320 * len(params), width=180, margin=dict(l=10, r=10, t=50, b=10),
+                      paper_bgcolor=DARK_THEME['component_bg'], font_color=DARK_THEME['text'], uirevision='live')
     return fig
 
-def create_trend_chart(df, param):
-    t = STATUS_THRESHOLDS[param]
-    latest_val = df[param].iloc[-1] if not df.empty else None
-    status = get_status(latest_val, param)
-    fig = go.Figure()
-    if not df.empty:
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df[param], mode="lines", line=dict(width=3, color=STATUS_COLORS[status]),
-            fill='tozeroy', fillcolor=f"rgba({int(STATUS_COLORS[status][1:3],16)}, {int(STATUS_COLORS[status][3:5],16)}, {int(STATUS_COLORS[status][5:7],16)}, 0.1)"
-        ))
-    fig.add_hline(y=t["warn"], line_dash="dash", line_color=STATUS_COLORS['warning'], opacity=0.5)
-    fig.add_hline(y=t["crit"], line_dash="dash", line_color=STATUS_COLORS['critical'], opacity=0.5)
-    fig.update_layout(title=f"{t['name']} Trend (Last Hour)", height=500, width=1000,
+def _trend_trace_props(df, param, status):
+    series = downsample(df[param]) if not df.empty else pd.Series(dtype=float)
+    return dict(x=series.index, y=series.to_numpy(), line=dict(width=3, color=STATUS_COLORS[status]),
+                fillcolor=STATUS_FILL_RGBA[status])
+
+@lru_cache(maxsize=1)
+def _trend_chart_template():
+    # Layout, axes and threshold lines never change, so build and validate them once and reuse the plain dict.
+    params = list(STATUS_THRESHOLDS)
+    fig = make_subplots(rows=len(params), cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                        subplot_titles=[f"{STATUS_THRESHOLDS[p]['name']} Trend (Last Hour)" for p in params])
+    for row, p in enumerate(params, start=1):
+        t = STATUS_THRESHOLDS[p]
+        fig.add_trace(go.Scattergl(name=t['name'], mode="lines", fill='tozeroy', x=[], y=[]), row=row, col=1)
+        fig.add_hline(y=t["warn"], line_dash="dash", line_color=STATUS_COLORS['warning'], opacity=0.5, row=row, col=1)
+        fig.add_hline(y=t["crit"], line_dash="dash", line_color=STATUS_COLORS['critical'], opacity=0.5, row=row, col=1)
+        fig.update_yaxes(range=[0, t['range'][1]*1.05], title_text=t['unit'], row=row, col=1)
+    fig.update_layout(height=500 * len(params), width=1000, showlegend=False,
                       paper_bgcolor=DARK_THEME['component_bg'], plot_bgcolor=DARK_THEME['background'],
                       font_color=DARK_THEME['text'], margin=dict(l=50, r=30, t=50, b=50),
-                      yaxis={'range':[0, t['range'][1]*1.05]}, xaxis_title=None, yaxis_title=t['unit'])
+                      # Constant uirevision: Plotly.react keeps the user's zoom/pan across patched ticks.
+                      uirevision='live')
+    return fig.to_dict()
+
+def create_trend_chart(df, statuses):
+    fig = copy.deepcopy(_trend_chart_template())
+    for trace, p in zip(fig["data"], STATUS_THRESHOLDS):
+        trace.update(_trend_trace_props(df, p, statuses[p]))
     return fig
 
+# --- Live View Patches ---
+# The live figures are built once per tab render; each tick only ships the changed values.
+def gauge_state(latest, statuses):
+    # What the gauges actually display: 0.1 resolution plus the status colour. Unchanged state -> no gauge patch.
+    return {p: [round(latest[p], 1) if pd.notna(latest[p]) else None, statuses[p]] for p in STATUS_THRESHOLDS}
+
+def patch_meter_gauges(latest, statuses):
+    patched = Patch()
+    for i, p in enumerate(STATUS_THRESHOLDS):
+        color = STATUS_COLORS[statuses[p]]
+        patched["data"][i]["value"] = latest[p] if pd.notna(latest[p]) else 0
+        patched["data"][i]["number"]["font"]["color"] = color
+        patched["data"][i]["gauge"]["bar"]["color"] = color
+    return patched
+
+def patch_trend_chart(df, statuses):
+    patched = Patch()
+    for i, p in enumerate(STATUS_THRESHOLDS):
+        patched["data"][i].update(_trend_trace_props(df, p, statuses[p]))
+    return patched
+
+def latest_values(reading):
+    # One reading -> plain dict, so the gauges and statuses below do cheap dict lookups; missing sensors become NaN.
+    if reading is None: return dict.fromkeys(STATUS_THRESHOLDS, np.nan)
+    return {p: np.nan if reading.get(p) is None else float(reading[p]) for p in STATUS_THRESHOLDS}
+
+def latest_statuses(latest):
+    return {p: get_status(latest[p], p) for p in STATUS_THRESHOLDS}
+
 # --- Dash App Layout ---
-app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
+# serve_locally=False pulls the Dash/Plotly JS bundles from the public CDN instead of this server.
+app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'], serve_locally=False)
 app.title = "Compressor Live Monitor"
 
+@app.server.after_request
+def cache_static_assets(response):
+    # Dash appends ?m=<mtime> to asset URLs, so a changed file gets a new URL and can be cached indefinitely.
+    # The repo ships no assets/ folder yet; this takes effect once one is added. Errors (404s) must stay uncached.
+    if response.status_code == 200 and request.path.startswith(app.get_asset_url("")):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+LIVE_HEADER_STYLE = {"textAlign": "center", "color": DARK_THEME['text_light'], 'fontWeight': 'bold', 'fontSize': '18px'}
+NO_DATA_STYLE = {"color": STATUS_COLORS['critical'], "textAlign": "center", "marginTop": "50px", "fontSize": "24px"}
+NO_DATA_TEXT = "⚠️ No Data Received in the Last Hour"
+
+def live_header(reading):
+    if reading is None: return NO_DATA_TEXT, NO_DATA_STYLE
+    return f"Last Update: {reading['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}", LIVE_HEADER_STYLE
+
+def build_live_layout():
+    df, reading = get_live_data()
+    latest = latest_values(reading)
+    statuses = latest_statuses(latest)
+    header_text, header_style = live_header(reading)
+    return html.Div([
+        html.H4(header_text, id='live-header', style=header_style),
+        dcc.Store(id='gauge-state', data=gauge_state(latest, statuses)),
+        dcc.Store(id='trend-ts', data=None if reading is None else reading['timestamp'].isoformat()),
+        html.Div([
+            # Parent flex container for 2 columns
+            html.Div([
+                # KPIs / Gauges column (30%)
+                dcc.Graph(id='gauge-graph', figure=create_meter_gauges(latest, statuses), config={"displayModeBar": False})
+            ], style={'width': '30%', 'padding': '10px'}),
+
+            # Trend Charts column (70%)
+            html.Div([dcc.Graph(id='trend-graph', figure=create_trend_chart(df, statuses), config={"displayModeBar": False})],
+                     style={'width': '70%', 'padding': '10px'})
+        ], style={'display': 'flex', 'flexDirection': 'row'})
+    ])
+
+# Static table styling, built once at import rather than on every query.
+EXPLORER_TABLE_STYLES = dict(
+    style_table={"overflowX": "auto"},
+    style_header={'backgroundColor': DARK_THEME['component_bg'], 'fontWeight': 'bold',
+                  'border': f"1px solid {DARK_THEME['border']}", 'fontSize':'16px'},
+    style_cell={'backgroundColor': DARK_THEME['background'], 'color': DARK_THEME['text'],
+                'border': f"1px solid {DARK_THEME['border']}", 'padding': '10px', 'textAlign': 'left', 'fontSize':'16px'},
+    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#f9f9f9'}]
+)
+
 def build_explorer_layout():
     return html.Div([
         html.Div([
@@ -132,54 +495,88 @@ app.layout = html.Div(style={'backgroundColor': DARK_THEME['background'], 'color
                  colors={"border": DARK_THEME['background'], "primary": STATUS_COLORS['normal'], "background": DARK_THEME['component_bg']})
     ], style={'maxWidth': '1600px', 'margin': 'auto', 'padding': '20px'}),
     html.Div(id="tab-content", style={'maxWidth': '1600px', 'margin': 'auto', 'padding': '20px'}),
-    dcc.Interval(id="interval", interval=10 * 1000, n_intervals=0)
+    dcc.Store(id="last-ts"),
+    dcc.Interval(id="interval", interval=REFRESH_INTERVALS[0][1], n_intervals=0)
 ])
 
 # --- Callbacks ---
 @app.callback(Output("tab-content", "children"), Input("tabs", "value"))
 def render_tab_content(tab):
     if tab == 'live':
-        return html.Div(id='live-content-container')
+        return build_live_layout()
     elif tab == 'explorer':
         return build_explorer_layout()
 
 @app.callback(
-    Output('live-content-container', 'children'),
+    Output('live-header', 'children'),
+    Output('live-header', 'style'),
+    Output('gauge-graph', 'figure'),
+    Output('trend-graph', 'figure'),
+    Output('gauge-state', 'data'),
+    Output('trend-ts', 'data'),
+    Output('last-ts', 'data'),
     Input('interval', 'n_intervals'),
-    State('tabs', 'value')
+    State('tabs', 'value'),
+    State('last-ts', 'data'),
+    State('gauge-state', 'data'),
+    State('trend-ts', 'data')
 )
-def update_live_view(n, active_tab):
-    if active_tab != 'live': return dash.no_update
+def update_live_view(n, active_tab, last_ts, last_gauge_state, trend_ts):
+    if active_tab != 'live': raise PreventUpdate
     
-    df = fetch_data(limit=200)
-    if df.empty:
-        return html.Div("⚠️ No Data Received in the Last Hour",
-                        style={"color": STATUS_COLORS['critical'], "textAlign": "center", "marginTop": "50px", "fontSize": "24px"})
+    df, reading = get_live_data()
+    if reading is None:
+        # last-ts keeps the last real reading so adapt_refresh_interval can back off on known-stale data.
+        if trend_ts is None:  # already blank: the layout was built empty, or a previous tick cleared it
+            return (*live_header(reading), *[dash.no_update] * 5)
+        # The hour has drained: blank the gauges and trends rather than leave stale readings in their old colours.
+        latest = latest_values(reading)
+        statuses = latest_statuses(latest)
+        return (*live_header(reading), patch_meter_gauges(latest, statuses), patch_trend_chart(df, statuses),
+                gauge_state(latest, statuses), None, dash.no_update)
 
-    latest = df.iloc[-1]
-    latest_time = latest.name.strftime("%Y-%m-%d %H:%M:%S")
-    one_hour_ago = df.index.max() - timedelta(hours=1)
-    chart_data = df[df.index >= one_hour_ago]
+    # Keyed on the raw reading, not its bucket, so every new reading inside an open bucket still updates.
+    latest_iso = reading["timestamp"].isoformat()
+    if latest_iso == last_ts:
+        raise PreventUpdate
+    latest = latest_values(reading)
+    statuses = latest_statuses(latest)
+    gauges = gauge_state(latest, statuses)
+    if gauges == last_gauge_state:
+        gauge_patch, gauges = dash.no_update, dash.no_update
+    else:
+        gauge_patch = patch_meter_gauges(latest, statuses)
+    if trend_ts and reading["timestamp"] - datetime.fromisoformat(trend_ts) < TREND_REFRESH:
+        trend_patch = dash.no_update
+    else:
+        trend_patch, trend_ts = patch_trend_chart(df, statuses), latest_iso
 
-    return html.Div([
-        html.H4(f"Last Update: {latest_time}", style={"textAlign": "center",
-                                                      "color": DARK_THEME['text_light'],
-                                                      'fontWeight': 'bold', 'fontSize':'18px'}),
-        html.Div([
-            # Parent flex container for 2 columns
-            html.Div([
-                # KPIs / Gauges column (30%)
-                html.Div([dcc.Graph(figure=create_meter_gauge(latest[p], p), config={"displayModeBar": False})
-                          for p in STATUS_THRESHOLDS.keys()],
-                         style={'display': 'flex', 'flexDirection': 'column', 'gap': '20px'})
-            ], style={'width': '30%', 'padding': '10px'}),
+    return (*live_header(reading), gauge_patch, trend_patch, gauges, trend_ts, latest_iso)
 
-            # Trend Charts column (70%)
-            html.Div([dcc.Graph(figure=create_trend_chart(chart_data, p), config={"displayModeBar": False})
-                      for p in STATUS_THRESHOLDS.keys()],
-                     style={'width': '70%', 'padding': '10px', 'display': 'flex', 'flexDirection': 'column', 'gap': '20px'})
-        ], style={'display': 'flex', 'flexDirection': 'row'})
-    ])
+@app.callback(
+    Output('interval', 'interval'),
+    Input('interval', 'n_intervals'),
+    Input('last-ts', 'data')
+)
+def adapt_refresh_interval(n, last_ts):
+    # No reading seen yet (e.g. the realtime seed is still in flight): poll fast until one arrives.
+    if not last_ts: return REFRESH_INTERVALS[0][1]
+    age = (now_ist() - datetime.fromisoformat(last_ts)).total_seconds()
+    return next(interval for max_age, interval in REFRESH_INTERVALS if age < max_age)
+
+# Pause polling while the browser tab is in the background; a hidden tab still ticking costs a callback round trip every 5 s.
+app.clientside_callback(
+    """
+    function(_) {
+        document.addEventListener('visibilitychange', function() {
+            dash_clientside.set_props('interval', {disabled: document.hidden});
+        });
+        return document.hidden;
+    }
+    """,
+    Output('interval', 'disabled'),
+    Input('interval', 'id')
+)
 
 @app.callback(
     Output('explorer-table-container', 'children'),
@@ -190,25 +587,33 @@ def update_explorer_table(n_clicks, start_date, end_date, selected_params):
     if n_clicks == 0: return "Please click 'Query Database' to fetch data."
     if not selected_params: return html.Div("⚠️ Please select at least one parameter to display.", style={"color": STATUS_COLORS['warning']})
     
-    df = fetch_data(start_date=start_date, end_date=end_date, desc=False, limit=2000)
+    # Only transfer the columns the user asked to see.
+    columns = ("timestamp", *selected_params)
+    df = fetch_data(start_date=start_date, end_date=end_date, desc=False, limit=EXPLORER_MAX_POINTS,
+                    ttl=EXPLORER_CACHE_TTL_SECONDS, columns=columns)
+    bucket = None
+    if start_date and end_date and len(df) >= EXPLORER_MAX_POINTS:
+        # The range doesn't fit in one PostgREST response: switch to per-bucket averages over the whole range.
+        df = fetch_downsampled(start_date, end_date, columns=columns)
+        span = pd.Timestamp(_end_exclusive(end_date)) - pd.Timestamp(start_date)
+        bucket = max(span / EXPLORER_MAX_POINTS, pd.Timedelta(seconds=1))
     if df.empty: return html.Div("⚠️ No Data Found for the Selected Criteria", style={"color": STATUS_COLORS['critical'], "textAlign": "center", "marginTop": "50px", "fontSize": "24px"})
     
-    df_table = df.reset_index()
+    # The query already projected onto `columns`, so no client-side column slicing is needed.
+    df_table = df.astype(float).round(EXPLORER_DECIMALS).reset_index()
     df_table['timestamp'] = df_table['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    display_cols = ['timestamp'] + selected_params
-    df_table = df_table[display_cols]
 
-    return dash_table.DataTable(
+    table = dash_table.DataTable(
         data=df_table.to_dict("records"),
-        columns=[{"name": c.replace('_', ' ').title(), "id": c} for c in df_table.columns],
+        columns=[{"name": "Bucket Start" if bucket is not None and c == "timestamp" else c.replace('_', ' ').title(), "id": c}
+                 for c in df_table.columns],
         page_size=20,
-        style_table={"overflowX": "auto"},
-        style_header={'backgroundColor': DARK_THEME['component_bg'], 'fontWeight': 'bold',
-                      'border': f"1px solid {DARK_THEME['border']}", 'fontSize':'16px'},
-        style_cell={'backgroundColor': DARK_THEME['background'], 'color': DARK_THEME['text'],
-                    'border': f"1px solid {DARK_THEME['border']}", 'padding': '10px', 'textAlign': 'left', 'fontSize':'16px'},
-        style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#f9f9f9'}]
+        **EXPLORER_TABLE_STYLES
     )
+    if bucket is None: return table
+    note = (f"More than {EXPLORER_MAX_POINTS} readings in this range: showing {bucket.total_seconds():.0f}-second "
+            f"averages, one row per bucket.")
+    return html.Div([html.P(note, style={"color": DARK_THEME['text_light']}), table])
 
 if __name__ == "__main__":
     app.run_server(debug=True, port=8050)
\ No newline at end of file
@@ -0,0 +1,51 @@
+-- Database-side setup for the compressor dashboard.
+
+-- Push new rows to the live monitor over Supabase Realtime (skipped if the table is already published,
+-- so the script can be re-run).
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'air_compressor'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE air_compressor;
+    END IF;
+END $$;
+
+-- Serves the "last hour" window and the explorer's date-range queries.
+CREATE INDEX IF NOT EXISTS air_compressor_ts_idx ON air_compressor (timestamp DESC);
+
+-- No BRIN index alongside it: the planner always prefers the btree for these range scans, and the
+-- ORDER BY ... LIMIT queries need the btree anyway, so a BRIN index would only add write cost.
+-- Sensor nodes should batch samples and POST a JSON array to /rest/v1/air_compressor
+-- (one multi-row INSERT per batch) rather than one request per sample.
+
+-- 10 s rollup of the last two hours; the live monitor seeds its one-hour window from here.
+-- Columns keep the base table's names so the dashboard reads it with the same query.
+CREATE MATERIALIZED VIEW IF NOT EXISTS air_compressor_10s AS
+SELECT date_bin('10 seconds', timestamp, TIMESTAMPTZ '2000-01-01') AS timestamp,
+       avg(temperature) AS temperature,
+       avg(pressure) AS pressure,
+       avg(vibration) AS vibration
+FROM air_compressor
+WHERE timestamp > now() - interval '2 hours'
+GROUP BY 1;
+
+-- Required for REFRESH ... CONCURRENTLY.
+CREATE UNIQUE INDEX IF NOT EXISTS air_compressor_10s_ts_idx ON air_compressor_10s (timestamp DESC);
+GRANT SELECT ON air_compressor_10s TO anon, authenticated;
+
+SELECT cron.schedule('refresh-air-compressor-10s', '10 seconds',
+                     'REFRESH MATERIALIZED VIEW CONCURRENTLY air_compressor_10s');
+
+-- Data Explorer: averages over _n equal buckets of [_start, _end), so any date range returns at most _n rows.
+CREATE OR REPLACE FUNCTION downsample_air_compressor(_start timestamptz, _end timestamptz, _n int)
+RETURNS TABLE ("timestamp" timestamptz, temperature double precision, pressure double precision, vibration double precision)
+LANGUAGE sql STABLE AS $$
+    SELECT date_bin(greatest((_end - _start) / _n, interval '1 second'), a.timestamp, _start),
+           avg(a.temperature), avg(a.pressure), avg(a.vibration)
+    FROM air_compressor a
+    WHERE a.timestamp >= _start AND a.timestamp < _end
+    GROUP BY 1
+    ORDER BY 1
+$$;